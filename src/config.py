@@ -0,0 +1,23 @@
+import logging
+from functools import lru_cache
+from dotenv import load_dotenv
+
+logger = logging.getLogger(__name__)
+
+@lru_cache(maxsize=1)
+def load_environment() -> bool:
+    """
+    Loads variables from a `.env` file into the process environment, once.
+
+    Called by the components that read configuration when they are first
+    constructed, instead of at import time, so importing a module has no
+    filesystem side effects. Variables already set in the environment take
+    precedence over the `.env` file.
+
+    Returns:
+        bool: True if a `.env` file was found and loaded.
+    """
+    loaded = load_dotenv()
+    if loaded:
+        logger.debug("Loaded environment variables from .env")
+    return loaded
@@ -1,24 +1,159 @@
+import io
 import os
+import atexit
+import struct
 import logging
 import psycopg2
+import numpy as np
+from contextlib import contextmanager
+from functools import lru_cache
+from psycopg2.extensions import connection as PgConnection
+from psycopg2.pool import ThreadedConnectionPool
 from psycopg2.extras import execute_values
-from typing import List
-from dotenv import load_dotenv
+from typing import Dict, Iterable, List, Iterator, Optional, Sequence, Set
+from config import load_environment
 
-load_dotenv()
 logger = logging.getLogger(__name__)
 
+# Output dimensionality of the embedding model (text-embedding-004).
+EMBEDDING_DIMENSIONS = 768
+# Embeddings are stored at half precision (pgvector >= 0.7): half the storage
+# and index size of `vector`, with negligible loss in retrieval quality.
+EMBEDDING_COLUMN_TYPE = f"halfvec({EMBEDDING_DIMENSIONS})"
+# process_document writes one block while looking up embeddings for the next,
+# so two connections are in use at once. psycopg2's pool closes any connection
+# returned while it already holds POOL_MIN_CONNECTIONS idle ones, so a lower
+# minimum would reconnect (and re-PREPARE) on nearly every block.
+POOL_MIN_CONNECTIONS = 2
+POOL_MAX_CONNECTIONS = 8
+COPY_FLUSH_ROWS = 10000
+# Batches up to this size are sent as a single multi-row INSERT; larger ones go
+# through COPY. Formatting and parsing vector literals costs ~0.5 ms per row,
+# about ten times the binary COPY cost, while COPY needs three extra round trips
+# (staging table, COPY, upsert), so the INSERT only wins for small batches.
+INSERT_PAGE_SIZE = 64
+
+CHUNK_COLUMNS = "filename, split_strategy, chunk_index, chunk_text, content_hash, embedding"
+
+CREATE_STAGING_QUERY = """
+CREATE TEMP TABLE IF NOT EXISTS document_chunks_staging (
+    filename TEXT,
+    split_strategy TEXT,
+    chunk_index INT,
+    chunk_text TEXT,
+    content_hash BYTEA,
+    embedding halfvec
+) ON COMMIT DELETE ROWS
+"""
+
+COPY_CHUNKS_QUERY = f"""
+COPY document_chunks_staging ({CHUNK_COLUMNS})
+FROM STDIN WITH (FORMAT BINARY)
+"""
+
+# Binary COPY framing: signature, flags and header-extension length, then one
+# int16 field count per tuple and an int16 -1 trailer.
+COPY_BINARY_HEADER = b"PGCOPY\n\xff\r\n\x00" + struct.pack("!ii", 0, 0)
+COPY_BINARY_TRAILER = struct.pack("!h", -1)
+_TUPLE_HEADER = struct.Struct("!h")
+_FIELD_LENGTH = struct.Struct("!i")
+_INT4_FIELD = struct.Struct("!ii")
+_NULL_FIELD = _FIELD_LENGTH.pack(-1)
+# pgvector halfvec binary format: int16 dimensions, int16 unused, then big-endian float2 values.
+_HALFVEC_HEADER = struct.Struct("!hh")
+
+UPSERT_ON_CONFLICT = """
+ON CONFLICT (filename, split_strategy, chunk_index)
+DO UPDATE SET chunk_text = EXCLUDED.chunk_text, content_hash = EXCLUDED.content_hash,
+    embedding = EXCLUDED.embedding
+"""
+
+# Prefixed to an upsert to also trim positions at or beyond the end of the new
+# chunk range in the same statement. The deleted and inserted positions are
+# disjoint, so the two never touch the same row.
+PRUNE_CTE = """
+WITH pruned AS (
+    DELETE FROM document_chunks
+    WHERE filename = %s AND split_strategy = %s AND (chunk_index >= %s OR chunk_index IS NULL)
+)
+"""
+
+INSERT_VALUES_QUERY = f"""
+INSERT INTO document_chunks ({CHUNK_COLUMNS})
+VALUES %s
+""" + UPSERT_ON_CONFLICT
+
+INSERT_VALUES_TEMPLATE = "(%s, %s, %s, %s, %s, %s::halfvec)"
+
+# One stored vector per requested hash; identical texts share the same embedding.
+FIND_BY_HASH_QUERY = """
+SELECT DISTINCT ON (content_hash) content_hash, embedding::text
+FROM document_chunks
+WHERE content_hash = ANY(%s)
+"""
+
+PREPARED_STATEMENTS = {
+    # The staging table is created before this is first prepared and, being a
+    # session-local temp table, outlives the statement on the same connection.
+    "ups_chunks": f"""
+        PREPARE ups_chunks AS
+        INSERT INTO document_chunks ({CHUNK_COLUMNS})
+        SELECT {CHUNK_COLUMNS}
+        FROM document_chunks_staging
+    """ + UPSERT_ON_CONFLICT,
+    "ups_chunks_prune": f"""
+        PREPARE ups_chunks_prune(text, text, int) AS
+        WITH pruned AS (
+            DELETE FROM document_chunks
+            WHERE filename = $1 AND split_strategy = $2 AND (chunk_index >= $3 OR chunk_index IS NULL)
+        )
+        INSERT INTO document_chunks ({CHUNK_COLUMNS})
+        SELECT {CHUNK_COLUMNS}
+        FROM document_chunks_staging
+    """ + UPSERT_ON_CONFLICT,
+    "del_chunks": """
+        PREPARE del_chunks(text, text) AS
+        DELETE FROM document_chunks WHERE filename = $1 AND split_strategy = $2
+    """,
+    "del_chunks_from": """
+        PREPARE del_chunks_from(text, text, int) AS
+        DELETE FROM document_chunks
+        WHERE filename = $1 AND split_strategy = $2 AND (chunk_index >= $3 OR chunk_index IS NULL)
+    """,
+}
+
+class PooledConnection(PgConnection):
+    """
+    A psycopg2 connection that remembers which statements it has prepared.
+
+    Prepared statements live for the whole server session, so each pooled
+    connection only needs to PREPARE a given statement once.
+
+    Attributes:
+        prepared_statements (Set[str]): Names of statements prepared on this session.
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.prepared_statements: Set[str] = set()
+
 class DatabaseManager:
     """
     Manages PostgreSQL database interactions for storing and retrieving document chunks.
     
+    Connections are served from a lazily created ThreadedConnectionPool so that
+    consecutive operations reuse an open session instead of paying the
+    TCP/TLS/auth handshake on every call.
+
     Attributes:
         db_url (str): The database connection URL retrieved from environment variables.
     """
     def __init__(self):
+        load_environment()
         self.db_url = os.getenv("POSTGRES_URL")
         if not self.db_url:
             raise ValueError("❌ Missing Configuration: 'POSTGRES_URL' is not set in the .env file.")
+        self._pool: Optional[ThreadedConnectionPool] = None
+        self._schema_ready = False
 
     def get_connection(self):
         """
@@ -29,82 +164,221 @@ class DatabaseManager:
         """
         return psycopg2.connect(self.db_url)
 
+    def _get_pool(self) -> ThreadedConnectionPool:
+        """
+        Returns the connection pool, creating it on first use.
+
+        The pool is closed automatically at interpreter shutdown.
+
+        Returns:
+            ThreadedConnectionPool: The shared connection pool for this manager.
+        """
+        if self._pool is None:
+            self._pool = ThreadedConnectionPool(
+                POOL_MIN_CONNECTIONS, POOL_MAX_CONNECTIONS, self.db_url, connection_factory=PooledConnection
+            )
+            atexit.register(self._pool.closeall)
+        return self._pool
+
+    @contextmanager
+    def _conn(self) -> Iterator["psycopg2.extensions.connection"]:
+        """
+        Borrows a pooled connection for the duration of a transaction.
+
+        The transaction is committed when the block exits normally and rolled
+        back if it raises; the connection is always returned to the pool.
+
+        Yields:
+            psycopg2.extensions.connection: A connection checked out from the pool.
+        """
+        pool = self._get_pool()
+        conn = pool.getconn()
+        try:
+            yield conn
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            pool.putconn(conn)
+
+    def _execute_prepared(self, conn: PooledConnection, cur, name: str, params: tuple):
+        """
+        Executes a statement from `PREPARED_STATEMENTS`, preparing it on first use.
+
+        Args:
+            conn (PooledConnection): The pooled connection the cursor belongs to.
+            cur (psycopg2.extensions.cursor): The cursor to execute on.
+            name (str): The prepared statement name.
+            params (tuple): The statement parameters; empty for parameterless statements.
+        """
+        if name not in conn.prepared_statements:
+            cur.execute(PREPARED_STATEMENTS[name])
+            conn.prepared_statements.add(name)
+        if params:
+            placeholders = ", ".join(["%s"] * len(params))
+            cur.execute(f"EXECUTE {name}({placeholders})", params)
+        else:
+            cur.execute(f"EXECUTE {name}")
+
     def setup_database(self):
         """
         Initializes the database schema by creating the necessary table and indexes if they don't exist.
+
+        Embeddings are stored in a pgvector ``halfvec`` column with an HNSW
+        index for cosine-distance search. Tables created by earlier versions,
+        which stored embeddings as a float array or a full-precision
+        ``vector``, are converted in place.
+
+        The schema is only set up once per manager: later calls return
+        immediately, so indexing many documents does not repeat the DDL.
         
         Raises:
             Exception: If database setup fails.
         """
-        conn = self.get_connection()
+        if self._schema_ready:
+            return
+
         try:
-            with conn.cursor() as cur:
-                create_table_query = """
+            with self._conn() as conn, conn.cursor() as cur:
+                cur.execute("CREATE EXTENSION IF NOT EXISTS vector;")
+                create_table_query = f"""
                 CREATE TABLE IF NOT EXISTS document_chunks (
                     id SERIAL PRIMARY KEY,
                     chunk_text TEXT NOT NULL,
-                    embedding double precision[],
+                    embedding {EMBEDDING_COLUMN_TYPE} NOT NULL,
                     filename TEXT NOT NULL,
                     split_strategy TEXT NOT NULL,
+                    chunk_index INT,
+                    content_hash BYTEA,
                     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
                 );
                 """
                 cur.execute(create_table_query)
+                cur.execute("ALTER TABLE document_chunks ADD COLUMN IF NOT EXISTS chunk_index INT;")
+                cur.execute("ALTER TABLE document_chunks ADD COLUMN IF NOT EXISTS content_hash BYTEA;")
+                _migrate_embedding_column(cur)
+                _enable_lz4_compression(cur)
                 cur.execute("CREATE INDEX IF NOT EXISTS idx_doc_filename ON document_chunks(filename);")
                 cur.execute("CREATE INDEX IF NOT EXISTS idx_doc_strategy ON document_chunks(split_strategy);")
-                
-            conn.commit()
+                cur.execute("CREATE INDEX IF NOT EXISTS idx_doc_content_hash ON document_chunks(content_hash);")
+                cur.execute(
+                    "CREATE UNIQUE INDEX IF NOT EXISTS idx_doc_chunk_position "
+                    "ON document_chunks(filename, split_strategy, chunk_index);"
+                )
+                cur.execute(
+                    "CREATE INDEX IF NOT EXISTS idx_doc_embedding "
+                    "ON document_chunks USING hnsw (embedding halfvec_cosine_ops);"
+                )
+
+            self._schema_ready = True
             logger.info("✅ Database initialized (Custom Indexes Created).")
         except Exception as e:
-            conn.rollback()
             logger.error(f"❌ DB Setup failed: {e}")
             raise e
-        finally:
-            conn.close()
 
-    def delete_existing_chunks(self, filename: str, strategy: str):
+    def delete_existing_chunks(self, filename: str, strategy: str, from_index: int = 0):
         """
         Deletes existing chunks for a specific file and splitting strategy to prevent duplicates.
 
+        The DELETE runs as a server-side prepared statement, planned once per
+        pooled connection. With a positive `from_index`, only chunks at or beyond that position are
+        removed (along with rows indexed before chunk positions existed), which
+        trims leftovers after re-indexing a document that now produces fewer chunks.
+
         Args:
             filename (str): The name of the file to clean up.
             strategy (str): The splitting strategy used (e.g., 'fixed', 'sentence').
+            from_index (int): The first chunk position to delete.
 
         Raises:
             Exception: If the deletion operation fails.
         """
-        conn = self.get_connection()
         try:
-            with conn.cursor() as cur:
-                delete_query = """
-                DELETE FROM document_chunks 
-                WHERE filename = %s AND split_strategy = %s
-                """
-                cur.execute(delete_query, (filename, strategy))
+            with self._conn() as conn, conn.cursor() as cur:
+                if from_index > 0:
+                    self._execute_prepared(conn, cur, "del_chunks_from", (filename, strategy, from_index))
+                else:
+                    self._execute_prepared(conn, cur, "del_chunks", (filename, strategy))
                 deleted_count = cur.rowcount
-                
-            conn.commit()
+
             if deleted_count > 0:
                 logger.info(f"♻️  Cleaned up {deleted_count} old records for '{filename}'.")
         except Exception as e:
-            conn.rollback()
             logger.error(f"❌ Cleanup failed: {e}")
             raise e
-        finally:
-            conn.close()
 
-    def insert_chunks(self, filename: str, strategy: str, chunks: List[str], embeddings: List[List[float]]):
+    def find_embeddings(self, content_hashes: Sequence[bytes]) -> Dict[bytes, np.ndarray]:
         """
-        Inserts new document chunks and their embeddings into the database.
+        Looks up stored embeddings by the content hash of their chunk text.
 
-        This method first cleans up old records for the same file and strategy, 
-        then performs a bulk insert of the new data.
+        Lets identical chunks (repeated boilerplate, or documents indexed
+        before on another machine) reuse a stored vector instead of calling
+        the embedding API again.
+
+        Args:
+            content_hashes (Sequence[bytes]): The hashes to look up.
+
+        Returns:
+            Dict[bytes, np.ndarray]: The float32 vectors found, keyed by hash.
+
+        Raises:
+            Exception: If the lookup fails.
+        """
+        if not content_hashes:
+            return {}
+
+        try:
+            with self._conn() as conn, conn.cursor() as cur:
+                cur.execute(FIND_BY_HASH_QUERY, (list(content_hashes),))
+                rows = cur.fetchall()
+        except Exception as e:
+            logger.error(f"❌ Embedding lookup failed: {e}")
+            raise
+
+        return {bytes(content_hash): _parse_vector_literal(text) for content_hash, text in rows}
+
+    def insert_chunks(
+        self,
+        filename: str,
+        strategy: str,
+        chunks: List[str],
+        embeddings: Sequence[np.ndarray],
+        start_index: int = 0,
+        prune: bool = False,
+        content_hashes: Optional[Sequence[bytes]] = None,
+    ):
+        """
+        Inserts or updates document chunks and their embeddings in the database.
+
+        Each chunk is keyed by (filename, strategy, chunk_index), where chunk_index
+        counts from `start_index`, and written with ``INSERT ... ON CONFLICT``, so
+        re-indexing overwrites rows in place instead of deleting them first.
+        Batches of up to ``INSERT_PAGE_SIZE`` rows are sent as one multi-row
+        INSERT via `execute_values`. Larger batches are streamed with
+        ``COPY ... FROM STDIN`` into a session-local staging table (flushing
+        every ``COPY_FLUSH_ROWS`` rows) and upserted from there by a
+        statement prepared once per pooled connection; the COPY uses the
+        binary ``halfvec`` format, so values are rounded to float16
+        client-side and sent as raw IEEE-754 bytes rather than formatted to
+        text and parsed back by the server.
+
+        With `prune`, positions at or beyond the end of this batch are deleted
+        by the same statement (a ``DELETE`` CTE), which saves a separate
+        `delete_existing_chunks` round trip after the last batch of a document.
 
         Args:
             filename (str): The name of the source file.
             strategy (str): The splitting strategy used.
             chunks (List[str]): A list of text chunks to insert.
-            embeddings (List[List[float]]): A list of corresponding embedding vectors.
+            embeddings (Sequence[np.ndarray]): The corresponding embedding vectors,
+                as float32 arrays (or anything convertible to one).
+            start_index (int): The chunk position of the first chunk, used when a
+                document is saved in several batches.
+            prune (bool): Whether this is the document's last batch, so that
+                positions beyond it should be removed.
+            content_hashes (Optional[Sequence[bytes]]): The content hash of each
+                chunk, stored for `find_embeddings`; None stores no hashes.
 
         Raises:
             Exception: If the insert operation fails.
@@ -112,31 +386,199 @@ class DatabaseManager:
         if not chunks:
             return
 
-        conn = self.get_connection()
+        if content_hashes is None:
+            content_hashes = [None] * len(chunks)
+        rows = (
+            (filename, strategy, index, chunk, content_hash, embedding)
+            for index, (chunk, content_hash, embedding)
+            in enumerate(zip(chunks, content_hashes, embeddings, strict=True), start_index)
+        )
+
         try:
-            with conn.cursor() as cur:
-                delete_query = "DELETE FROM document_chunks WHERE filename = %s AND split_strategy = %s"
-                cur.execute(delete_query, (filename, strategy))
-                
-                insert_query = """
-                INSERT INTO document_chunks (filename, split_strategy, chunk_text, embedding)
-                VALUES %s
-                """
-                
-                data = [
-                    (filename, strategy, chunk, embedding)
-                    for chunk, embedding in zip(chunks, embeddings, strict=True)
-                ]
-                
-                execute_values(cur, insert_query, data)
-                
-            conn.commit()
-            logger.info(f"✅ Saved {len(data)} chunks to database.")
+            with self._conn() as conn, conn.cursor() as cur:
+                end_index = start_index + len(chunks)
+                if len(chunks) <= INSERT_PAGE_SIZE:
+                    query = INSERT_VALUES_QUERY
+                    if prune:
+                        # execute_values re-parses the query for placeholders, so
+                        # escape any '%' in the bound filename and strategy.
+                        prefix = cur.mogrify(PRUNE_CTE, (filename, strategy, end_index)).replace(b"%", b"%%")
+                        query = prefix + INSERT_VALUES_QUERY.encode()
+                    execute_values(
+                        cur, query,
+                        (row[:5] + (_to_halfvec_literal(row[5]),) for row in rows),
+                        template=INSERT_VALUES_TEMPLATE, page_size=INSERT_PAGE_SIZE,
+                    )
+                else:
+                    _copy_to_staging(cur, rows)
+                    if prune:
+                        self._execute_prepared(conn, cur, "ups_chunks_prune", (filename, strategy, end_index))
+                    else:
+                        self._execute_prepared(conn, cur, "ups_chunks", ())
+
+            logger.info(f"✅ Saved {len(chunks)} chunks to database.")
         except Exception as e:
-            conn.rollback()
             logger.exception(f"❌ Insert failed: {e}")
             raise
-        finally:
-            conn.close()
 
-db_manager = DatabaseManager()
\ No newline at end of file
+def _migrate_embedding_column(cur):
+    """
+    Converts the embedding column of an older schema to ``EMBEDDING_COLUMN_TYPE``.
+
+    The HNSW index is dropped first, since its operator class is tied to the
+    column type; `setup_database` recreates it afterwards.
+
+    Args:
+        cur (psycopg2.extensions.cursor): The cursor to run the statements on.
+    """
+    cur.execute(
+        "SELECT format_type(atttypid, atttypmod) FROM pg_attribute "
+        "WHERE attrelid = 'document_chunks'::regclass AND attname = 'embedding'"
+    )
+    column_type = cur.fetchone()[0]
+    if column_type != EMBEDDING_COLUMN_TYPE:
+        logger.info(f"♻️  Converting embedding column from {column_type} to {EMBEDDING_COLUMN_TYPE}...")
+        cur.execute("DROP INDEX IF EXISTS idx_doc_embedding")
+        cur.execute(
+            f"ALTER TABLE document_chunks ALTER COLUMN embedding "
+            f"TYPE {EMBEDDING_COLUMN_TYPE} USING embedding::{EMBEDDING_COLUMN_TYPE}"
+        )
+
+def _enable_lz4_compression(cur):
+    """
+    Switches TOAST compression of ``chunk_text`` to LZ4 when the server supports it.
+
+    A chunk row (text plus a 768-dimension halfvec) is just over the ~2 kB TOAST
+    threshold, so chunk text is usually compressed on write and decompressed on
+    read; LZ4 does both several times faster than the default pglz. Only values
+    written afterwards are affected, and servers built without LZ4 (or older
+    than PostgreSQL 14) keep pglz.
+
+    Args:
+        cur (psycopg2.extensions.cursor): The cursor to run the statements on.
+    """
+    cur.execute("SELECT 'lz4' = ANY(enumvals) FROM pg_settings WHERE name = 'default_toast_compression'")
+    row = cur.fetchone()
+    if not row or not row[0]:
+        return
+
+    cur.execute(
+        "SELECT attcompression FROM pg_attribute "
+        "WHERE attrelid = 'document_chunks'::regclass AND attname = 'chunk_text'"
+    )
+    if cur.fetchone()[0] != "l":
+        cur.execute("ALTER TABLE document_chunks ALTER COLUMN chunk_text SET COMPRESSION lz4")
+
+def _to_halfvec_literal(embedding: np.ndarray) -> str:
+    """
+    Formats an embedding vector as a pgvector ``halfvec`` text literal.
+
+    Values are rounded to float16 client-side and written with 5 significant
+    digits, the shortest fixed precision that round-trips every float16 exactly.
+
+    Args:
+        embedding (np.ndarray): The embedding vector.
+
+    Returns:
+        str: The vector as ``[v1,v2,...]``.
+    """
+    values = np.asarray(embedding, dtype=np.float16).tolist()
+    return "[" + ",".join(["%.5g" % v for v in values]) + "]"
+
+def _parse_vector_literal(text: str) -> np.ndarray:
+    """
+    Parses a pgvector text literal such as ``[v1,v2,...]``.
+
+    Args:
+        text (str): The vector in pgvector's text format.
+
+    Returns:
+        np.ndarray: The vector as a float32 array.
+    """
+    return np.array(text[1:-1].split(","), dtype=np.float32)
+
+def _encode_halfvec(embedding: np.ndarray) -> bytes:
+    """
+    Encodes a vector in pgvector's binary ``halfvec`` wire format.
+
+    Args:
+        embedding (np.ndarray): The embedding vector.
+
+    Returns:
+        bytes: The dimension header followed by the big-endian float16 values.
+    """
+    values = np.asarray(embedding, dtype=">f2")
+    return _HALFVEC_HEADER.pack(values.shape[0], 0) + values.tobytes()
+
+def _copy_to_staging(cur, rows: Iterable[tuple]):
+    """
+    Streams rows into the session's staging table with binary COPY.
+
+    Args:
+        cur (psycopg2.extensions.cursor): The cursor to run the statements on.
+        rows (Iterable[tuple]): Rows of (filename, strategy, chunk_index, chunk_text,
+            content_hash, embedding).
+    """
+    cur.execute(CREATE_STAGING_QUERY)
+    encoding = psycopg2.extensions.encodings[cur.connection.encoding]
+
+    buf = io.BytesIO()
+    buf.write(COPY_BINARY_HEADER)
+    row_count = 0
+    for filename, strategy, index, chunk, content_hash, embedding in rows:
+        filename_bytes = filename.encode(encoding)
+        strategy_bytes = strategy.encode(encoding)
+        chunk_bytes = chunk.encode(encoding)
+        vector_bytes = _encode_halfvec(embedding)
+        buf.write(_TUPLE_HEADER.pack(6))
+        buf.write(_FIELD_LENGTH.pack(len(filename_bytes)))
+        buf.write(filename_bytes)
+        buf.write(_FIELD_LENGTH.pack(len(strategy_bytes)))
+        buf.write(strategy_bytes)
+        buf.write(_INT4_FIELD.pack(4, index))
+        buf.write(_FIELD_LENGTH.pack(len(chunk_bytes)))
+        buf.write(chunk_bytes)
+        if content_hash is None:
+            buf.write(_NULL_FIELD)
+        else:
+            buf.write(_FIELD_LENGTH.pack(len(content_hash)))
+            buf.write(content_hash)
+        buf.write(_FIELD_LENGTH.pack(len(vector_bytes)))
+        buf.write(vector_bytes)
+
+        row_count += 1
+        if row_count % COPY_FLUSH_ROWS == 0:
+            _flush_copy(cur, buf)
+    if buf.tell() > len(COPY_BINARY_HEADER):
+        _flush_copy(cur, buf)
+
+def _flush_copy(cur, buf: io.BytesIO):
+    """
+    Terminates the buffered binary COPY stream, sends it, and starts a new one.
+
+    Args:
+        cur (psycopg2.extensions.cursor): The cursor to run the COPY on.
+        buf (io.BytesIO): The buffer holding the COPY header and encoded tuples.
+    """
+    buf.write(COPY_BINARY_TRAILER)
+    buf.seek(0)
+    cur.copy_expert(COPY_CHUNKS_QUERY, buf)
+    buf.seek(0)
+    buf.truncate()
+    buf.write(COPY_BINARY_HEADER)
+
+@lru_cache(maxsize=1)
+def get_db_manager() -> DatabaseManager:
+    """
+    Returns the shared DatabaseManager, creating it on first use.
+
+    Deferring construction keeps `import database_manager` free of
+    configuration lookups and database I/O.
+
+    Returns:
+        DatabaseManager: The process-wide database manager.
+
+    Raises:
+        ValueError: If POSTGRES_URL is not set.
+    """
+    return DatabaseManager()
\ No newline at end of file
@@ -1,15 +1,59 @@
 import logging
+import mmap
 import re
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Optional
-from pypdf import PdfReader
+from typing import Iterator, Optional
+import pymupdf
 from docx import Document
 
 logger = logging.getLogger(__name__)
 
+_SPACE_RUN_RE = re.compile(r' {2,}')
+
+@contextmanager
+def _open_pdf(file_path: Path) -> Iterator[pymupdf.Document]:
+    """
+    Opens a PDF from a read-only memory map of the file.
+
+    MuPDF parses straight out of the page cache through the mapping, so the
+    file is never copied into a Python buffer, and its random seeks (xref
+    table, object streams) do not go through read() calls. The mapping stays
+    alive until the document is closed.
+
+    Args:
+        file_path (Path): The pathlib.Path object pointing to the PDF file.
+
+    Yields:
+        pymupdf.Document: The opened document.
+    """
+    with open(file_path, "rb") as f, \
+         mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped, \
+         memoryview(mapped) as view, \
+         pymupdf.open(stream=view, filetype="pdf") as doc:
+        yield doc
+
+def _iter_pdf_pages(file_path: Path) -> Iterator[str]:
+    """
+    Yields the raw text of each non-empty page of a PDF file, one page at a time.
+
+    The document is closed when the generator is exhausted, fails, or is closed early.
+
+    Args:
+        file_path (Path): The pathlib.Path object pointing to the PDF file.
+
+    Yields:
+        str: The text content of a single page.
+    """
+    with _open_pdf(file_path) as doc:
+        for page in doc:
+            content = page.get_text("text")
+            if content:
+                yield content
+
 def _extract_from_pdf(file_path: Path) -> Optional[str]:
     """
-    Extracts text content from a PDF file.
+    Extracts text content from a PDF file using PyMuPDF.
 
     Args:
         file_path (Path): The pathlib.Path object pointing to the PDF file.
@@ -17,14 +61,8 @@ def _extract_from_pdf(file_path: Path) -> Optional[str]:
     Returns:
         Optional[str]: The extracted text combined into a single string, or None if extraction fails.
     """
-    text_parts = []
     try:
-        reader = PdfReader(str(file_path))
-        for page in reader.pages:
-            content = page.extract_text(extraction_mode="layout")
-            if content:
-                text_parts.append(content)
-        return "\n".join(text_parts)
+        return "\n".join(_iter_pdf_pages(file_path))
     except Exception:
         logger.exception(f"Failed to parse PDF file: {file_path.name}")
         return None
@@ -51,7 +89,9 @@ def _clean_text(text: str) -> str:
     Normalizes whitespace in the given text.
 
     Replaces multiple whitespace characters (including tabs) with a single space
-    and strips leading/trailing whitespace.
+    and strips leading/trailing whitespace. Tabs are first mapped to spaces with
+    `str.replace`, so the regex only has to touch runs of two or more spaces
+    rather than rewriting every single space in the document.
 
     Args:
         text (str): The input text to clean.
@@ -61,25 +101,21 @@ def _clean_text(text: str) -> str:
     """
     if not text:
         return ""
-    return re.sub(r'[ \t]+', ' ', text).strip()
+    return _SPACE_RUN_RE.sub(' ', text.replace('\t', ' ')).strip()
 
-def load_and_clean_document(file_path_str: str) -> str:
+def _resolve_document(file_path_str: str) -> Path:
     """
-    Loads a document from the filesystem and returns its cleaned text content.
-
-    This function supports PDF and DOCX formats. It handles file reading,
-    text extraction, and basic whitespace normalization.
+    Validates that a document exists and has a supported format.
 
     Args:
         file_path_str (str): The absolute or relative path to the document file.
 
     Returns:
-        str: The extracted and cleaned text content of the document.
+        Path: The validated path.
 
     Raises:
         FileNotFoundError: If the specified file does not exist.
         ValueError: If the file format (extension) is not supported.
-        RuntimeError: If text extraction fails (e.g., empty result from parser).
     """
     path = Path(file_path_str)
     
@@ -88,16 +124,38 @@ def load_and_clean_document(file_path_str: str) -> str:
         raise FileNotFoundError(f"File not found: {path}")
         
     ext = path.suffix.lower()
+    if ext not in ('.pdf', '.docx'):
+        logger.error(f"Unsupported file format: {ext}")
+        raise ValueError(f"Unsupported format: {ext}")
+
+    return path
+
+def load_and_clean_document(file_path_str: str) -> str:
+    """
+    Loads a document from the filesystem and returns its cleaned text content.
+
+    This function supports PDF and DOCX formats. It handles file reading,
+    text extraction, and basic whitespace normalization.
+
+    Args:
+        file_path_str (str): The absolute or relative path to the document file.
+
+    Returns:
+        str: The extracted and cleaned text content of the document.
+
+    Raises:
+        FileNotFoundError: If the specified file does not exist.
+        ValueError: If the file format (extension) is not supported.
+        RuntimeError: If text extraction fails (e.g., empty result from parser).
+    """
+    path = _resolve_document(file_path_str)
     
     raw_text: Optional[str] = None
     
-    if ext == '.pdf':
+    if path.suffix.lower() == '.pdf':
         raw_text = _extract_from_pdf(path)
-    elif ext == '.docx':
-        raw_text = _extract_from_docx(path)
     else:
-        logger.error(f"Unsupported file format: {ext}")
-        raise ValueError(f"Unsupported format: {ext}")
+        raw_text = _extract_from_docx(path)
     
     if raw_text is None:
         raise RuntimeError(f"Failed to extract text from {path.name}. Check logs for details.")
@@ -107,4 +165,53 @@ def load_and_clean_document(file_path_str: str) -> str:
     if not cleaned_text:
         logger.warning(f"Document {path.name} was parsed successfully but is empty.")
         
-    return cleaned_text
\ No newline at end of file
+    return cleaned_text
+
+def _iter_cleaned_pdf_pages(path: Path) -> Iterator[str]:
+    """
+    Yields the cleaned text of each non-empty PDF page.
+
+    Args:
+        path (Path): The validated path to the PDF file.
+
+    Yields:
+        str: The cleaned text of a single page.
+
+    Raises:
+        RuntimeError: If the PDF cannot be parsed.
+    """
+    try:
+        for content in _iter_pdf_pages(path):
+            cleaned = _clean_text(content)
+            if cleaned:
+                yield cleaned
+    except Exception as e:
+        logger.exception(f"Failed to parse PDF file: {path.name}")
+        raise RuntimeError(f"Failed to extract text from {path.name}. Check logs for details.") from e
+
+def iter_document_pages(file_path_str: str) -> Iterator[str]:
+    """
+    Streams a document's cleaned text page by page.
+
+    PDF pages are extracted lazily, so only one page is held in memory at a
+    time. DOCX files have no page structure and are yielded as a single piece.
+    The path is validated eagerly, before the first page is requested.
+
+    Args:
+        file_path_str (str): The absolute or relative path to the document file.
+
+    Returns:
+        Iterator[str]: An iterator over the cleaned, non-empty page texts.
+
+    Raises:
+        FileNotFoundError: If the specified file does not exist.
+        ValueError: If the file format (extension) is not supported.
+        RuntimeError: If text extraction fails (raised during iteration for PDFs).
+    """
+    path = _resolve_document(file_path_str)
+
+    if path.suffix.lower() == '.pdf':
+        return _iter_cleaned_pdf_pages(path)
+
+    text = load_and_clean_document(file_path_str)
+    return iter([text] if text else [])
@@ -0,0 +1,137 @@
+import hashlib
+import logging
+import sqlite3
+import threading
+import numpy as np
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = ".embed_cache.sqlite3"
+_SQLITE_MAX_PARAMS = 500
+
+def content_hash(text: str, namespace: str = "") -> bytes:
+    """
+    Computes the content hash of a text for a given namespace.
+
+    Args:
+        text (str): The text to hash.
+        namespace (str): A prefix mixed into the hash (typically the model name),
+            so that vectors from different models never collide.
+
+    Returns:
+        bytes: A 16-byte BLAKE2b digest of the namespace and the text.
+    """
+    digest = hashlib.blake2b(namespace.encode("utf-8"), digest_size=16)
+    digest.update(b"\0")
+    digest.update(text.encode("utf-8"))
+    return digest.digest()
+
+class EmbeddingCache:
+    """
+    Persistent, content-addressed cache of embedding vectors backed by SQLite.
+
+    Entries are keyed by a BLAKE2b digest of the model name and the text, so
+    re-indexing unchanged chunks can skip the embedding API entirely. Vectors
+    are stored as packed float32 blobs. The database file is opened lazily on
+    first use, so constructing a cache performs no I/O.
+
+    Attributes:
+        path (str): The filesystem path of the SQLite database.
+        namespace (str): A prefix mixed into every key (typically the model name).
+    """
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, namespace: str = ""):
+        self.path = path
+        self.namespace = namespace
+        self._db: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connection(self) -> sqlite3.Connection:
+        """
+        Returns the SQLite connection, creating the database on first use.
+
+        Returns:
+            sqlite3.Connection: The open cache database connection.
+        """
+        if self._db is None:
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)"
+            )
+        return self._db
+
+    def key(self, text: str) -> str:
+        """
+        Computes the cache key for a text.
+
+        Args:
+            text (str): The text whose embedding is cached.
+
+        Returns:
+            str: The text's `content_hash` as 32 hexadecimal characters.
+        """
+        return content_hash(text, self.namespace).hex()
+
+    def get_many(self, texts: List[str]) -> Dict[str, np.ndarray]:
+        """
+        Looks up cached embeddings for several texts.
+
+        Args:
+            texts (List[str]): The texts to look up.
+
+        Returns:
+            Dict[str, np.ndarray]: The cached float32 vectors of the texts that were
+            found, keyed by text. Cache read errors are logged and treated as misses.
+        """
+        keys = {self.key(text): text for text in texts}
+        found: Dict[str, np.ndarray] = {}
+        if not keys:
+            return found
+
+        key_list = list(keys)
+        try:
+            with self._lock:
+                db = self._connection()
+                for start in range(0, len(key_list), _SQLITE_MAX_PARAMS):
+                    batch = key_list[start:start + _SQLITE_MAX_PARAMS]
+                    placeholders = ",".join("?" * len(batch))
+                    rows = db.execute(
+                        f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", batch
+                    )
+                    for key, blob in rows:
+                        found[keys[key]] = np.frombuffer(blob, dtype=np.float32)
+        except sqlite3.Error:
+            logger.exception("Embedding cache lookup failed; treating as cache miss.")
+        return found
+
+    def set_many(self, items: Dict[str, np.ndarray]):
+        """
+        Stores embeddings for several texts.
+
+        Args:
+            items (Dict[str, np.ndarray]): The vectors to cache, keyed by text.
+                Cache write errors are logged and otherwise ignored.
+        """
+        if not items:
+            return
+
+        rows = [
+            (self.key(text), np.asarray(vector, dtype=np.float32).tobytes())
+            for text, vector in items.items()
+        ]
+        try:
+            with self._lock:
+                db = self._connection()
+                with db:
+                    db.executemany("INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)", rows)
+        except sqlite3.Error:
+            logger.exception("Embedding cache write failed.")
+
+    def close(self):
+        """
+        Closes the underlying database connection, if open.
+        """
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
@@ -1,26 +1,50 @@
 import os
 import time
+import random
 import logging
-from typing import List, Optional
+import numpy as np
+from contextlib import nullcontext
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+from typing import ContextManager, Dict, List, Optional
 from google import genai
-from google.genai import types
-from dotenv import load_dotenv
-
-load_dotenv()
+from google.genai import errors, types
+from embedding_cache import EmbeddingCache, DEFAULT_CACHE_PATH, content_hash
+from config import load_environment
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_BATCH_SIZE = 100
+DEFAULT_MAX_WORKERS = 8
+MAX_RETRIES = 3
+RETRY_MIN_DELAY = 0.1
+RETRY_BASE_DELAY = 0.2
+RETRY_MAX_DELAY = 8.0
+HTTP_TOO_MANY_REQUESTS = 429
+# API error status (google.rpc.Code name) of a request whose contents were rejected.
+INVALID_ARGUMENT_STATUS = "INVALID_ARGUMENT"
+
+# Bounds in-flight API requests across processes; set by `limit_concurrent_requests`.
+_request_slots: ContextManager = nullcontext()
+
 class EmbeddingClient:
     """
     Client for interacting with Google's GenAI embedding models.
 
     This client handles the initialization of the Google GenAI service and provides
-    methods to generate text embeddings safely with retry logic.
+    methods to generate text embeddings safely with retry logic, either one text at
+    a time or in batches of up to `DEFAULT_BATCH_SIZE` texts per request.
+
+    Embeddings are cached on disk by content hash (see `EmbeddingCache`), so
+    re-indexing unchanged chunks does not call the API again. The cache location
+    is read from `EMBEDDING_CACHE_PATH`; set it to an empty string to disable caching.
 
     Attributes:
         model_name (str): The name of the embedding model to use (default: "text-embedding-004").
+        cache (Optional[EmbeddingCache]): The embedding cache, or None if disabled.
     """
     def __init__(self):
+        load_environment()
         api_key = os.getenv("GEMINI_API_KEY")
         
         if not api_key:
@@ -30,39 +54,237 @@ class EmbeddingClient:
         self.client = genai.Client(api_key=api_key)
         self.model_name = "text-embedding-004"
 
-    def get_embedding(self, text: str) -> Optional[List[float]]:
+        cache_path = os.getenv("EMBEDDING_CACHE_PATH", DEFAULT_CACHE_PATH)
+        self.cache = EmbeddingCache(cache_path, namespace=self.model_name) if cache_path else None
+
+    def _embed(self, contents: List[str]) -> Optional[np.ndarray]:
         """
-        Generates an embedding vector for the given text using the Google GenAI SDK.
+        Calls the embedding endpoint for one request, retrying on failure.
+
+        Retries back off exponentially with full jitter so that concurrent
+        batches hitting the same transient error do not retry in lockstep.
+        Client errors other than rate limiting (HTTP 429) are not retried,
+        since resending the same request cannot succeed; they are raised so
+        the caller can tell a rejected input from a transient failure.
 
         Args:
-            text (str): The input text to be embedded.
+            contents (List[str]): The non-empty texts to embed in a single request.
 
         Returns:
-            Optional[List[float]]: A list of floating-point numbers representing the embedding,
-            or None if the text is empty or generation fails after retries.
-        """
-        if not text:
-            return None
+            Optional[np.ndarray]: A float32 matrix with one row per input text, in
+            input order, or None if the request fails after all retries.
 
-        retries = 3
+        Raises:
+            errors.ClientError: If the API rejects the request with a 4xx status other than 429.
+        """
+        retries = MAX_RETRIES
         for attempt in range(retries):
             try:
-                response = self.client.models.embed_content(
-                    model=self.model_name,
-                    contents=text,
-                    config=types.EmbedContentConfig(
-                        task_type="RETRIEVAL_DOCUMENT"
+                with _request_slots:
+                    response = self.client.models.embed_content(
+                        model=self.model_name,
+                        contents=contents,
+                        config=types.EmbedContentConfig(
+                            task_type="RETRIEVAL_DOCUMENT"
+                        )
                     )
-                )
                 
-                if response.embeddings:
-                    return response.embeddings[0].values
+                if response.embeddings and len(response.embeddings) == len(contents):
+                    return np.asarray([embedding.values for embedding in response.embeddings], dtype=np.float32)
                 
             except Exception as e:
+                if isinstance(e, errors.ClientError) and e.code != HTTP_TOO_MANY_REQUESTS:
+                    raise
                 logger.warning(f"Attempt {attempt + 1}/{retries} failed: {e}")
-                time.sleep(1)
+                if attempt + 1 < retries:
+                    time.sleep(_backoff_delay(attempt))
                 
         logger.error("Failed to generate embedding.")
         return None
-    
-embedding_client = EmbeddingClient()
\ No newline at end of file
+
+    def _embed_batch(self, contents: List[str]) -> List[Optional[np.ndarray]]:
+        """
+        Embeds one batch, isolating the texts that make the request invalid.
+
+        A text the API rejects as an invalid argument would otherwise cost
+        every text in its batch its embedding. Such a batch is split in half
+        and each half is requested again, recursively, so each bad text is
+        isolated in about ``2 * log2(len(contents))`` requests, wherever the
+        bad texts sit. Transient failures (rate limiting, server errors) and
+        errors that concern the request as a whole (e.g. an invalid API key,
+        which is also a 400) say nothing about individual texts, so the batch
+        is given up after a single request instead of bisected.
+
+        Args:
+            contents (List[str]): The non-empty texts to embed.
+
+        Returns:
+            List[Optional[np.ndarray]]: One float32 vector per input text, in
+            input order; None for texts that could not be embedded.
+        """
+        try:
+            vectors = self._embed(contents)
+        except errors.ClientError as e:
+            if not _is_input_error(e):
+                logger.error(f"Embedding request rejected: {e}")
+                return [None] * len(contents)
+            if len(contents) == 1:
+                logger.warning(f"Skipping a text the embedding API rejected: {e}")
+                return [None]
+            middle = len(contents) // 2
+            return self._embed_batch(contents[:middle]) + self._embed_batch(contents[middle:])
+
+        if vectors is None:
+            return [None] * len(contents)
+        return list(vectors)
+
+    def content_hash(self, text: str) -> bytes:
+        """
+        Computes the hash identifying the embedding of a text under this client's model.
+
+        Args:
+            text (str): The text to hash.
+
+        Returns:
+            bytes: A 16-byte digest of the model name and the text.
+        """
+        return content_hash(text, self.model_name)
+
+    def get_embedding(self, text: str) -> Optional[np.ndarray]:
+        """
+        Generates an embedding vector for the given text using the Google GenAI SDK.
+
+        Args:
+            text (str): The input text to be embedded.
+
+        Returns:
+            Optional[np.ndarray]: A 1-D float32 array representing the embedding,
+            or None if the text is empty or generation fails after retries.
+        """
+        if not text:
+            return None
+
+        return self.get_embeddings([text])[0]
+
+    def get_embeddings(
+        self,
+        texts: List[str],
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+    ) -> List[Optional[np.ndarray]]:
+        """
+        Generates embeddings for many texts, sending up to `batch_size` texts per request.
+
+        Texts found in the cache are served from it, and duplicate texts are
+        requested only once. The remaining batches are dispatched concurrently
+        on a thread pool so that their network round-trips overlap. Empty texts
+        are never sent to the API. A batch the API rejects as invalid is
+        bisected to isolate the offending texts; texts that cannot be embedded
+        get None, so callers can still pair results with their inputs by position.
+
+        Args:
+            texts (List[str]): The input texts to be embedded.
+            batch_size (int): The maximum number of texts per API request.
+            max_workers (int): The maximum number of requests in flight at once.
+
+        Returns:
+            List[Optional[np.ndarray]]: One 1-D float32 vector per input text, in
+            input order; None for empty texts or texts that could not be embedded.
+        """
+        results: List[Optional[np.ndarray]] = [None] * len(texts)
+        positions: Dict[str, List[int]] = {}
+        for i, text in enumerate(texts):
+            if text:
+                positions.setdefault(text, []).append(i)
+
+        if self.cache and positions:
+            cached = self.cache.get_many(list(positions))
+            for text, vector in cached.items():
+                for i in positions.pop(text):
+                    results[i] = vector
+            if cached:
+                logger.info(f"Embedding cache hits: {len(cached)}")
+
+        missing = list(positions)
+        batches = [missing[start:start + batch_size] for start in range(0, len(missing), batch_size)]
+        if not batches:
+            return results
+
+        fresh: Dict[str, np.ndarray] = {}
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(batches))) as executor:
+            for batch, vectors in zip(batches, executor.map(self._embed_batch, batches)):
+                for text, vector in zip(batch, vectors):
+                    if vector is not None:
+                        fresh[text] = vector
+                        for i in positions[text]:
+                            results[i] = vector
+
+        if self.cache:
+            self.cache.set_many(fresh)
+
+        return results
+
+def _is_input_error(error: errors.ClientError) -> bool:
+    """
+    Tells whether a client error blames the contents of the request.
+
+    The API reports both bad input and request-wide problems such as an
+    invalid API key as HTTP 400 ``INVALID_ARGUMENT``; the latter carry an
+    ``ErrorInfo`` detail with a reason (e.g. ``API_KEY_INVALID``).
+
+    Args:
+        error (errors.ClientError): The error raised for an embedding request.
+
+    Returns:
+        bool: True if the status is ``INVALID_ARGUMENT`` and no request-wide reason is given.
+    """
+    if error.status != INVALID_ARGUMENT_STATUS:
+        return False
+    body = error.details.get("error", error.details) if isinstance(error.details, dict) else None
+    details = body.get("details") if isinstance(body, dict) else None
+    return not any(isinstance(detail, dict) and detail.get("reason") for detail in details or [])
+
+def _backoff_delay(attempt: int) -> float:
+    """
+    Computes a jittered exponential backoff delay for a retry attempt.
+
+    Args:
+        attempt (int): The zero-based index of the attempt that just failed.
+
+    Returns:
+        float: Seconds to sleep, drawn uniformly between `RETRY_MIN_DELAY` and
+        `RETRY_BASE_DELAY * 2**attempt` (capped at `RETRY_MAX_DELAY`).
+    """
+    ceiling = min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** attempt)
+    return random.uniform(RETRY_MIN_DELAY, max(RETRY_MIN_DELAY, ceiling))
+
+def limit_concurrent_requests(slots: ContextManager):
+    """
+    Makes every embedding request in this process hold one of `slots`.
+
+    Used as a worker-pool initializer, so that several processes sharing one
+    semaphore stay within a single API concurrency limit instead of each
+    running `DEFAULT_MAX_WORKERS` requests of its own.
+
+    Args:
+        slots (ContextManager): A semaphore (typically a multiprocessing
+            BoundedSemaphore) acquired for the duration of each request.
+    """
+    global _request_slots
+    _request_slots = slots
+
+@lru_cache(maxsize=1)
+def get_embedding_client() -> EmbeddingClient:
+    """
+    Returns the shared EmbeddingClient, creating it on first use.
+
+    Deferring construction keeps `import embedding_client` free of credential
+    lookups and GenAI client setup.
+
+    Returns:
+        EmbeddingClient: The process-wide embedding client.
+
+    Raises:
+        ValueError: If GEMINI_API_KEY is not set.
+    """
+    return EmbeddingClient()
\ No newline at end of file
@@ -1,10 +1,14 @@
 import os
 import logging
+import multiprocessing
+import numpy as np
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
-from document_loader import load_and_clean_document
+from typing import Iterable, Iterator, Sequence
+from document_loader import iter_document_pages
 from text_splitter import split_by_fixed_size, split_by_sentence, split_by_paragraph
-from embedding_client import embedding_client
-from database_manager import db_manager
+from embedding_client import get_embedding_client, limit_concurrent_requests, DEFAULT_MAX_WORKERS
+from database_manager import get_db_manager
 
 logging.basicConfig(
     level=logging.INFO,
@@ -13,6 +17,40 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+STREAM_BLOCK_CHARS = 200_000
+MIN_CHUNK_CHARS = 16
+# Default cap on corpus worker processes. Each worker opens its own database
+# connections (two in steady state: the embedding lookup and the writer thread,
+# up to POOL_MAX_CONNECTIONS) and its own embedding client, so scaling with the
+# CPU count alone can exhaust PostgreSQL's max_connections on large machines.
+MAX_DEFAULT_WORKERS = 4
+
+def _iter_text_blocks(pages: Iterable[str], block_chars: int) -> Iterator[str]:
+    """Groups streamed page texts into blocks of roughly `block_chars` characters."""
+    buffer = []
+    size = 0
+    for page in pages:
+        buffer.append(page)
+        size += len(page)
+        if size >= block_chars:
+            yield "\n".join(buffer)
+            buffer = []
+            size = 0
+    if buffer:
+        yield "\n".join(buffer)
+
+def _mark_last(items: Iterable[str]) -> Iterator[tuple[str, bool]]:
+    """Yields each item with a flag that is True only for the final one, reading one item ahead."""
+    iterator = iter(items)
+    try:
+        current = next(iterator)
+    except StopIteration:
+        return
+    for upcoming in iterator:
+        yield current, False
+        current = upcoming
+    yield current, True
+
 def _chunk_text(text: str, strategy: str) -> list[str]:
     """Splits text based on the selected strategy."""
     logger.info(f"Splitting text using strategy: {strategy}")
@@ -25,83 +63,280 @@ def _chunk_text(text: str, strategy: str) -> list[str]:
     else:
         raise ValueError(f"Unknown strategy: {strategy}")
 
-def _generate_embeddings(chunks: list[str]) -> list[list[float] | None]:
-    """Generates embeddings for a list of text chunks."""
+def _drop_short_chunks(chunks: list[str]) -> list[str]:
+    """Removes blank chunks and chunks shorter than `MIN_CHUNK_CHARS`, which embed to noise."""
+    kept = [chunk for chunk in chunks if len(chunk.strip()) >= MIN_CHUNK_CHARS]
+    dropped = len(chunks) - len(kept)
+    if dropped:
+        logger.info(f"Dropped {dropped} empty or short chunks (< {MIN_CHUNK_CHARS} chars).")
+    return kept
+
+def _generate_embeddings(chunks: list[str], content_hashes: list[bytes]) -> list[np.ndarray | None]:
+    """
+    Generates embeddings for a list of text chunks using batched API requests.
+
+    Chunks whose content hash already has a vector in the database reuse it;
+    only the rest are sent to the embedding API.
+    """
     logger.info("Starting embedding generation...")
-    embeddings = []
-    
-    for i, chunk in enumerate(chunks):
-        vector = embedding_client.get_embedding(chunk)
-        embeddings.append(vector)
-        
-        if vector:
-            if i == 0: 
-                logger.info("✅ Sample Check - Chunk #0 embedded successfully.")
-                logger.info(f"   Vector dimensions: {len(vector)}")
+    embeddings: list[np.ndarray | None] = [None] * len(chunks)
+    try:
+        stored = get_db_manager().find_embeddings(list(dict.fromkeys(content_hashes)))
+    except Exception as e:
+        logger.warning(f"⚠️ Stored embedding lookup failed, embedding all chunks: {e}")
+        stored = {}
+
+    missing = []
+    for i, content_hash in enumerate(content_hashes):
+        if content_hash in stored:
+            embeddings[i] = stored[content_hash]
         else:
+            missing.append(i)
+    if len(missing) < len(chunks):
+        logger.info(f"♻️  Reused {len(chunks) - len(missing)} stored embeddings.")
+
+    if missing:
+        fresh = get_embedding_client().get_embeddings([chunks[i] for i in missing])
+        for i, vector in zip(missing, fresh):
+            embeddings[i] = vector
+    
+    for i, vector in enumerate(embeddings):
+        if vector is None:
             logger.warning(f"⚠️ Failed to embed chunk #{i} (Result: None)")
             
     return embeddings
 
-def _save_to_db(file_name: str, strategy: str, chunks: list[str], embeddings: list[list[float] | None]):
-    """Filters valid embeddings and saves them to the database."""
+def _save_to_db(file_name: str, strategy: str, chunks: list[str], embeddings: list[np.ndarray | None],
+                start_index: int = 0, prune: bool = False, content_hashes: list[bytes] | None = None) -> int:
+    """
+    Filters valid embeddings and saves them to the database. Returns the number of rows saved.
+
+    With `prune`, positions beyond the saved range are trimmed by the same statement.
+    """
     valid_chunks = []
     valid_embeddings = []
+    valid_hashes = []
     
-    for chunk, vector in zip(chunks, embeddings):
+    for chunk, vector, content_hash in zip(chunks, embeddings, content_hashes or [None] * len(chunks)):
         if vector is not None:
             valid_chunks.append(chunk)
             valid_embeddings.append(vector)
+            valid_hashes.append(content_hash)
 
     logger.info(f"Embedding success rate: {len(valid_embeddings)}/{len(chunks)}")
 
     if valid_embeddings:
         logger.info(f"💾 Saving {len(valid_embeddings)} records to PostgreSQL...")
         try:
-            db_manager.insert_chunks(file_name, strategy, valid_chunks, valid_embeddings)
-            logger.info("✅ DONE! Document successfully indexed in Database.")
+            get_db_manager().insert_chunks(
+                file_name, strategy, valid_chunks, valid_embeddings, start_index=start_index, prune=prune,
+                content_hashes=valid_hashes if content_hashes is not None else None,
+            )
+            return len(valid_chunks)
         except Exception as e:
             logger.error(f"❌ Failed to save to database: {e}")
     else:
         logger.warning("⚠️ No valid embeddings generated. Nothing to save to DB.")
+    return 0
+
+def _confirm_saved(future: Future, start_index: int, has_chunks: bool) -> int:
+    """
+    Waits for a block's background save and returns the chunk position just past it.
+
+    Raises:
+        RuntimeError: If the block had chunks but none of them were saved, because
+            every embedding failed or the database write failed.
+    """
+    saved = future.result()
+    if has_chunks and not saved:
+        raise RuntimeError(f"Block starting at chunk #{start_index} was not saved.")
+    return start_index + saved
 
-def process_document(file_path: str, strategy: str = 'fixed'):
-    """Orchestrates the document indexing process."""
+def process_document(file_path: str, strategy: str = 'fixed', setup: bool = True):
+    """
+    Orchestrates the document indexing process.
+
+    Pages are streamed from the loader and processed in blocks of about
+    `STREAM_BLOCK_CHARS` characters (split, embed, save), so the full document
+    text is never held in memory at once. Each block is saved on a background
+    writer thread while the next block is being embedded, so database writes
+    overlap with embedding requests; at most one block is in flight.
+
+    Saved chunks overwrite previous rows by position, and positions left over
+    from a longer previous version of the document are deleted along with the
+    last block's insert. Pass ``setup=False`` when the schema has already been
+    created, e.g. by `process_corpus`.
+
+    Returns None if the document could not be fully indexed, including when a
+    block had chunks but none of them were saved.
+    """
     logger.info(f"🚀 Processing file: {file_path}")
 
     try:
-        db_manager.setup_database()
-        text = load_and_clean_document(file_path)
+        if setup:
+            get_db_manager().setup_database()
+        pages = iter_document_pages(file_path)
     except Exception as e:
         logger.error(f"❌ Process failed at setup/loading: {e}")
         return
 
+    file_name = Path(file_path).name
+    embeddings = []
+    next_index = 0
+    # Positions below `saved_index` are confirmed to hold this version's chunks.
+    saved_index = 0
+    pruned = False
+    # The in-flight save: its future, first chunk position, and whether it had chunks.
+    pending: tuple[Future, int, bool] | None = None
+
     try:
-        chunks = _chunk_text(text, strategy)
-        logger.info(f"Generated {len(chunks)} chunks.")
-        
-        embeddings = _generate_embeddings(chunks)
-        
-        file_name = Path(file_path).name
-        _save_to_db(file_name, strategy, chunks, embeddings)
+        with ThreadPoolExecutor(max_workers=1) as writer:
+            for block, is_last in _mark_last(_iter_text_blocks(pages, STREAM_BLOCK_CHARS)):
+                chunks = _drop_short_chunks(_chunk_text(block, strategy))
+                logger.info(f"Generated {len(chunks)} chunks.")
+
+                content_hashes = [get_embedding_client().content_hash(chunk) for chunk in chunks]
+                block_embeddings = _generate_embeddings(chunks, content_hashes)
+                if not embeddings and block_embeddings and block_embeddings[0] is not None:
+                    logger.info("✅ Sample Check - Chunk #0 embedded successfully.")
+                    logger.info(f"   Vector dimensions: {len(block_embeddings[0])}")
+                if pending is not None:
+                    job, pending = pending, None
+                    saved_index = _confirm_saved(*job)
+                future = writer.submit(
+                    _save_to_db, file_name, strategy, chunks, block_embeddings,
+                    start_index=next_index, prune=is_last, content_hashes=content_hashes,
+                )
+                pending = (future, next_index, bool(chunks))
+                next_index += sum(vector is not None for vector in block_embeddings)
+                embeddings.extend(block_embeddings)
+
+            if pending is not None:
+                job, pending = pending, None
+                saved_index = _confirm_saved(*job)
+                pruned = job[2]
+
+        if next_index and not pruned:
+            get_db_manager().delete_existing_chunks(file_name, strategy, from_index=next_index)
         
+        logger.info("✅ DONE! Document successfully indexed in Database.")
         return embeddings # Return for testing/debug
         
     except Exception as e:
         logger.error(f"❌ Process failed during execution: {e}")
+        _discard_stale_chunks(file_name, strategy, saved_index, pending)
+        return
+    finally:
+        # Release the loader's open document (e.g. the PDF and its mmap) even
+        # when indexing stops before the last page.
+        close = getattr(pages, "close", None)
+        if close is not None:
+            close()
+
+def _discard_stale_chunks(file_name: str, strategy: str, saved_index: int,
+                          pending: tuple[Future, int, bool] | None):
+    """
+    Deletes a previous version's chunks left behind by a partially indexed document.
+
+    Blocks are upserted by position and only the last one prunes, so when
+    indexing stops early, rows of the previous version beyond the new chunks
+    would otherwise stay mixed in with them. A save that was still in flight
+    is settled first. If nothing of the new version was written, the previous
+    version is left intact rather than deleted.
+    """
+    if pending is not None:
+        try:
+            saved_index = _confirm_saved(*pending)
+        except Exception:
+            pass
+    if not saved_index:
         return
+    try:
+        get_db_manager().delete_existing_chunks(file_name, strategy, from_index=saved_index)
+        logger.warning(f"⚠️ Removed stale chunks from #{saved_index} on; {file_name} is only partially indexed.")
+    except Exception as e:
+        logger.error(f"❌ Failed to remove stale chunks of {file_name}: {e}")
+
+def _index_file(job: tuple[str, str]) -> tuple[str, bool]:
+    """Worker entry point for `process_corpus`: indexes one file and reports whether it succeeded."""
+    file_path, strategy = job
+    return file_path, process_document(file_path, strategy=strategy, setup=False) is not None
+
+def process_corpus(file_paths: Sequence[str], strategy: str = 'fixed', max_workers: int | None = None) -> dict[str, bool]:
+    """
+    Indexes several documents in parallel worker processes.
+
+    The schema is created once up front, then each file is indexed by
+    `process_document` in a pool of `max_workers` processes (default: the
+    CPU count, capped at `MAX_DEFAULT_WORKERS`), so PDF parsing of one
+    document overlaps with embedding requests and inserts of others. Workers are spawned rather than forked, so every
+    process lazily builds its own embedding client and connection pool
+    instead of inheriting live sockets. The workers share one semaphore
+    capping in-flight embedding requests at `DEFAULT_MAX_WORKERS` in total,
+    so adding processes does not multiply the load on the API's rate limit.
+
+    Chunks are keyed by file name, so files that share a name (e.g. from
+    different directories) would overwrite each other's rows; they are
+    rejected and reported as failed instead of being indexed.
+
+    Returns:
+        dict[str, bool]: Whether each file was indexed successfully, keyed by path.
+    """
+    try:
+        get_db_manager().setup_database()
+    except Exception as e:
+        logger.error(f"❌ Corpus indexing failed at setup: {e}")
+        return {file_path: False for file_path in file_paths}
+
+    by_name: dict[str, list[str]] = {}
+    for file_path in dict.fromkeys(file_paths):
+        by_name.setdefault(Path(file_path).name, []).append(file_path)
+    clashing = [file_path for paths in by_name.values() if len(paths) > 1 for file_path in paths]
+    if clashing:
+        logger.error(f"❌ Files share a name and would overwrite each other's chunks: {', '.join(clashing)}")
+
+    jobs = [(paths[0], strategy) for paths in by_name.values() if len(paths) == 1]
+    workers = min(max_workers or min(os.cpu_count() or 1, MAX_DEFAULT_WORKERS), len(jobs))
+    if workers <= 1:
+        results = dict(map(_index_file, jobs))
+    else:
+        logger.info(f"🚀 Indexing {len(jobs)} files with {workers} worker processes...")
+        context = multiprocessing.get_context("spawn")
+        request_slots = context.BoundedSemaphore(DEFAULT_MAX_WORKERS)
+        with context.Pool(workers, initializer=limit_concurrent_requests, initargs=(request_slots,)) as pool:
+            results = dict(pool.imap_unordered(_index_file, jobs))
+    results.update((file_path, False) for file_path in clashing)
+
+    failed = [file_path for file_path, ok in results.items() if not ok]
+    logger.info(f"✅ Indexed {len(results) - len(failed)}/{len(results)} files.")
+    if failed:
+        logger.warning(f"⚠️ Failed to index: {', '.join(failed)}")
+    return results
 
 if __name__ == "__main__":
     import argparse
+    from config import load_environment
+
+    # Load .env up front so settings read by any component (not only the
+    # database and embedding clients) see it.
+    load_environment()
     
     parser = argparse.ArgumentParser(description="Index a document into the vector database.")
-    parser.add_argument("--file", type=str, required=True, help="Path to the document file (PDF, DOCX).")
+    parser.add_argument("--file", type=str, nargs="+", required=True,
+                        help="Path(s) to the document file(s) (PDF, DOCX).")
     parser.add_argument("--strategy", type=str, default="fixed", choices=["fixed", "sentence", "paragraph"],
                         help="Text splitting strategy (default: fixed).")
+    parser.add_argument("--workers", type=int, default=None,
+                        help=f"Worker processes when indexing several files (default: CPU count, at most {MAX_DEFAULT_WORKERS}).")
     
     args = parser.parse_args()
     
-    if os.path.exists(args.file):
-        process_document(args.file, strategy=args.strategy)
-    else:
-        logger.error(f"❌ File not found: {args.file}")
\ No newline at end of file
+    files = [path for path in args.file if os.path.exists(path)]
+    for path in args.file:
+        if path not in files:
+            logger.error(f"❌ File not found: {path}")
+
+    if len(files) == 1:
+        process_document(files[0], strategy=args.strategy)
+    elif files:
+        process_corpus(files, strategy=args.strategy, max_workers=args.workers)
\ No newline at end of file
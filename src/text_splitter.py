@@ -1,6 +1,8 @@
+import os
 import logging
 import nltk
 import re
+from functools import lru_cache
 from typing import List
 
 DEFAULT_CHUNK_SIZE = 500
@@ -8,15 +10,21 @@ DEFAULT_OVERLAP = 50
 
 logger = logging.getLogger(__name__)
 
+# A sentence boundary is whitespace after terminal punctuation (optionally
+# followed by one closing quote or bracket) that is not followed by a lowercase
+# letter, which skips most mid-sentence abbreviations such as "e.g. this".
+_SENTENCE_BOUNDARY_RE = re.compile(r'(?:(?<=[.!?…])|(?<=[.!?…]["\'”’)\]]))\s+(?=[^\sa-z])')
+
 
 def _ensure_punkt():
     """
     Ensures that the NLTK 'punkt' tokenizer data is downloaded.
 
-    Checks if 'tokenizers/punkt' is available; if not, attempts to download it.
+    Checks if 'tokenizers/punkt_tab' (the format NLTK 3.9+ loads) is available;
+    if not, attempts to download it.
     """
     try:
-        nltk.data.find('tokenizers/punkt')
+        nltk.data.find('tokenizers/punkt_tab')
     except LookupError:
         logger.info("Downloading NLTK punkt tokenizer...")
         try:
@@ -26,6 +34,39 @@ def _ensure_punkt():
             logger.exception("Failed to download NLTK punkt tokenizer.")
             raise
 
+@lru_cache(maxsize=1)
+def _get_tokenizer() -> nltk.tokenize.PunktTokenizer:
+    """
+    Returns the English Punkt sentence tokenizer, loading it on first use.
+
+    The punkt data check (a search of every NLTK data directory) and the
+    model load run once per process instead of on every document.
+
+    Returns:
+        nltk.tokenize.PunktTokenizer: The shared tokenizer instance.
+    """
+    _ensure_punkt()
+    return nltk.tokenize.PunktTokenizer("english")
+
+def _split_sentences(text: str) -> List[str]:
+    """
+    Splits text into sentences.
+
+    Uses a compiled regex by default. Setting the environment variable
+    ``SENTENCE_SPLITTER=nltk`` switches to NLTK's Punkt tokenizer, which
+    handles abbreviations better but is considerably slower and needs the
+    punkt data (downloaded on first use).
+
+    Args:
+        text (str): The input text to split.
+
+    Returns:
+        List[str]: The sentences, in order.
+    """
+    if os.getenv("SENTENCE_SPLITTER", "regex").lower() == "nltk":
+        return _get_tokenizer().tokenize(text)
+    return _SENTENCE_BOUNDARY_RE.split(text.strip())
+
 def split_by_fixed_size(text: str, chunk_size: int = DEFAULT_CHUNK_SIZE, overlap: int = DEFAULT_OVERLAP) -> List[str]:
     """
     Splits text into fixed-size character chunks with specified overlap.
@@ -45,25 +86,19 @@ def split_by_fixed_size(text: str, chunk_size: int = DEFAULT_CHUNK_SIZE, overlap
         return []
     if overlap >= chunk_size:
         raise ValueError("overlap must be smaller than chunk_size")
-    chunks = []
-    start = 0
-    text_len = len(text)
-    while start < text_len:
-        end = min(start + chunk_size, text_len)
-        chunk = text[start:end]
-        chunks.append(chunk)
-        if end == text_len:
-            break
-        start = end - overlap
-    return chunks
+    # Chunks start every `step` characters; the last one is the first to reach
+    # the end of the text, i.e. the last start before `len(text) - overlap`.
+    step = chunk_size - overlap
+    starts = range(0, max(len(text) - overlap, 1), step)
+    return [text[start:start + chunk_size] for start in starts]
 
 def split_by_sentence(text: str, max_chars: int = DEFAULT_CHUNK_SIZE) -> List[str]:
     """
-    Splits text by sentences using NLTK, ensuring chunks don't exceed a maximum character length.
+    Splits text by sentences, ensuring chunks don't exceed a maximum character length.
 
     This strategy tries to keep sentences together. If a single sentence exceeds `max_chars`,
     it may still be included (depending on implementation specifics) or force a split.
-    Fallbacks to fixed-size splitting if NLTK fails.
+    Fallbacks to fixed-size splitting if sentence tokenization fails.
 
     Args:
         text (str): The input text to split.
@@ -76,10 +111,9 @@ def split_by_sentence(text: str, max_chars: int = DEFAULT_CHUNK_SIZE) -> List[st
         return []
 
     try:
-        _ensure_punkt()
-        sentences = nltk.sent_tokenize(text)
+        sentences = _split_sentences(text)
     except Exception as e:
-        logger.exception(f"NLTK tokenization failed: {e}. Falling back to simple split.")
+        logger.exception(f"Sentence tokenization failed: {e}. Falling back to simple split.")
         return split_by_fixed_size(text, max_chars, 0)
 
     chunks = []
@@ -115,7 +149,10 @@ def split_by_paragraph(text: str, max_chars: int = DEFAULT_CHUNK_SIZE) -> List[s
     if not text:
         return []
     
-    paragraphs = [p.strip() for p in re.split(r'\n{2,}', text) if p.strip()]
+    # Splitting on every "\n\n" leaves empty or "\n"-prefixed pieces inside longer
+    # newline runs; stripping drops them, giving the same paragraphs as a regex
+    # split on r'\n{2,}' while scanning with str.split's C search instead.
+    paragraphs = [p for p in map(str.strip, text.split("\n\n")) if p]
     chunks = []
     current_chunk = []
     current_len = 0
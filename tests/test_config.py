@@ -0,0 +1,22 @@
+import pytest
+from unittest.mock import patch
+from src.config import load_environment
+
+"""
+Unit tests for the config module, verifying that the .env file is loaded
+lazily and only once per process.
+"""
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Resets the load_environment cache around each test."""
+    load_environment.cache_clear()
+    yield
+    load_environment.cache_clear()
+
+def test_load_environment_runs_once():
+    """Ensures load_dotenv is called on first use only and its result is reused."""
+    with patch("src.config.load_dotenv", return_value=True) as mock_load:
+        assert load_environment() is True
+        assert load_environment() is True
+        mock_load.assert_called_once_with()
@@ -1,7 +1,8 @@
 import pytest
+import pymupdf
 from unittest.mock import MagicMock, patch
 from pathlib import Path
-from src.document_loader import load_and_clean_document
+from src.document_loader import load_and_clean_document, iter_document_pages, _clean_text
 
 """
 Unit tests for the document_loader module, verifying PDF/DOCX extraction
@@ -18,14 +19,14 @@ def mock_path_exists():
 @pytest.mark.usefixtures("mock_path_exists")
 def test_load_and_clean_pdf():
     """Tests successful extraction and cleaning of text from a PDF file."""
-    with patch("src.document_loader.PdfReader") as MockPdfReader:
+    with patch("src.document_loader._open_pdf") as mock_open_pdf:
         # Setup mock behavior
-        mock_reader = MockPdfReader.return_value
+        mock_doc = mock_open_pdf.return_value.__enter__.return_value
         page1 = MagicMock()
-        page1.extract_text.return_value = "Page 1 content."
+        page1.get_text.return_value = "Page 1 content."
         page2 = MagicMock()
-        page2.extract_text.return_value = "Page 2 content."
-        mock_reader.pages = [page1, page2]
+        page2.get_text.return_value = "Page 2 content."
+        mock_doc.__iter__.return_value = iter([page1, page2])
 
         content = load_and_clean_document("dummy.pdf")
         
@@ -71,3 +72,49 @@ def test_empty_parsed_content():
         mock_extract.return_value = None
         with pytest.raises(RuntimeError, match="Failed to extract text"):
             load_and_clean_document("empty.pdf")
+
+def test_clean_text_collapses_spaces_and_tabs():
+    """Verifies runs of spaces and tabs collapse to one space while newlines are kept."""
+    assert _clean_text("  a \t\tb   c\t\n d  ") == "a b c \n d"
+    assert _clean_text("") == ""
+
+@pytest.mark.usefixtures("mock_path_exists")
+def test_iter_document_pages_streams_pdf():
+    """Tests that PDF pages are yielded lazily, cleaned, and with empty pages skipped."""
+    with patch("src.document_loader._open_pdf") as mock_open_pdf:
+        mock_doc = mock_open_pdf.return_value.__enter__.return_value
+        pages = [MagicMock(), MagicMock(), MagicMock()]
+        pages[0].get_text.return_value = "Page  1\tcontent."
+        pages[1].get_text.return_value = "   "
+        pages[2].get_text.return_value = "Page 2 content."
+        mock_doc.__iter__.return_value = iter(pages)
+
+        stream = iter_document_pages("dummy.pdf")
+        mock_open_pdf.assert_not_called()
+
+        assert list(stream) == ["Page 1 content.", "Page 2 content."]
+        mock_open_pdf.return_value.__exit__.assert_called_once()
+
+@pytest.mark.usefixtures("mock_path_exists")
+def test_iter_document_pages_parse_failure():
+    """Ensures a PDF parsing error surfaces as RuntimeError during iteration."""
+    with patch("src.document_loader._open_pdf", side_effect=Exception("corrupt")):
+        with pytest.raises(RuntimeError, match="Failed to extract text"):
+            list(iter_document_pages("broken.pdf"))
+
+def test_iter_document_pages_validates_eagerly():
+    """Checks that a missing file is reported before any page is requested."""
+    with patch("pathlib.Path.exists", return_value=False):
+        with pytest.raises(FileNotFoundError):
+            iter_document_pages("nonexistent.pdf")
+
+def test_iter_document_pages_reads_real_pdf(tmp_path):
+    """Parses a generated two-page PDF through the memory-mapped reader."""
+    pdf_path = tmp_path / "generated.pdf"
+    doc = pymupdf.open()
+    for text in ("First  page\ttext.", "Second page text."):
+        doc.new_page().insert_text((72, 72), text)
+    doc.save(str(pdf_path))
+    doc.close()
+
+    assert list(iter_document_pages(str(pdf_path))) == ["First page text.", "Second page text."]
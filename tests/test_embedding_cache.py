@@ -0,0 +1,46 @@
+import pytest
+import numpy as np
+from src.embedding_cache import EmbeddingCache
+
+"""
+Unit tests for the EmbeddingCache, verifying key derivation, persistence of
+vectors across instances, and graceful handling of missing entries.
+"""
+
+@pytest.fixture
+def cache(tmp_path):
+    """Provides an EmbeddingCache backed by a temporary SQLite file."""
+    cache = EmbeddingCache(str(tmp_path / "cache.sqlite3"), namespace="model-a")
+    yield cache
+    cache.close()
+
+def test_init_does_not_create_file(tmp_path):
+    """Ensures constructing a cache performs no I/O until it is used."""
+    path = tmp_path / "cache.sqlite3"
+    EmbeddingCache(str(path))
+    assert not path.exists()
+
+def test_round_trip(cache, tmp_path):
+    """Checks that stored vectors are returned by a new instance on the same file."""
+    cache.set_many({"hello": [0.5, -1.25], "world": np.array([2.0], dtype=np.float32)})
+
+    reopened = EmbeddingCache(str(tmp_path / "cache.sqlite3"), namespace="model-a")
+    found = reopened.get_many(["hello", "world", "missing"])
+    assert sorted(found) == ["hello", "world"]
+    assert found["hello"].dtype == np.float32
+    assert found["hello"].tolist() == [0.5, -1.25]
+    assert found["world"].tolist() == [2.0]
+    reopened.close()
+
+def test_namespace_isolates_keys(cache, tmp_path):
+    """Verifies that entries written under one namespace are not visible in another."""
+    cache.set_many({"hello": [1.0]})
+
+    other = EmbeddingCache(str(tmp_path / "cache.sqlite3"), namespace="model-b")
+    assert other.get_many(["hello"]) == {}
+    assert other.key("hello") != cache.key("hello")
+    other.close()
+
+def test_get_many_empty(cache):
+    """Ensures an empty lookup returns an empty mapping."""
+    assert cache.get_many([]) == {}
@@ -1,7 +1,9 @@
 import pytest
 from unittest.mock import MagicMock, patch
 import os
-from src.embedding_client import EmbeddingClient
+import numpy as np
+from google.genai import errors
+from src.embedding_client import EmbeddingClient, get_embedding_client, limit_concurrent_requests, _backoff_delay, RETRY_MAX_DELAY, RETRY_MIN_DELAY
 
 """
 Unit tests for the EmbeddingClient, verifying initialization, API key handling,
@@ -10,8 +12,8 @@ embedding generation, and retry logic with mocked Google GenAI calls.
 
 @pytest.fixture
 def mock_env_api_key():
-    """Sets a mock GEMINI_API_KEY in the environment for testing."""
-    with patch.dict(os.environ, {"GEMINI_API_KEY": "fake_key"}):
+    """Sets a mock GEMINI_API_KEY in the environment and disables the on-disk cache."""
+    with patch.dict(os.environ, {"GEMINI_API_KEY": "fake_key", "EMBEDDING_CACHE_PATH": ""}):
         yield
 
 def test_init_raises_without_api_key():
@@ -27,6 +29,17 @@ def test_init_success():
         client = EmbeddingClient()
         assert client.model_name == "text-embedding-004"
 
+@pytest.mark.usefixtures("mock_env_api_key")
+def test_get_embedding_client_is_cached():
+    """Checks that get_embedding_client constructs the client once and reuses it."""
+    get_embedding_client.cache_clear()
+    try:
+        with patch("src.embedding_client.genai.Client") as MockGenAI:
+            assert get_embedding_client() is get_embedding_client()
+            MockGenAI.assert_called_once()
+    finally:
+        get_embedding_client.cache_clear()
+
 @pytest.mark.usefixtures("mock_env_api_key")
 def test_get_embedding_success():
     """Tests successful embedding generation using a mocked GenAI client."""
@@ -40,7 +53,8 @@ def test_get_embedding_success():
         client = EmbeddingClient()
         embedding = client.get_embedding("test text")
         
-        assert embedding == [0.1, 0.2, 0.3]
+        assert embedding.dtype == np.float32
+        assert embedding.tolist() == pytest.approx([0.1, 0.2, 0.3])
         mock_client_instance.models.embed_content.assert_called_once()
 
 @pytest.mark.usefixtures("mock_env_api_key")
@@ -64,3 +78,183 @@ def test_get_embedding_retry_failure():
         result = client.get_embedding("text")
         assert result is None
         assert mock_client_instance.models.embed_content.call_count == 3
+
+@pytest.mark.usefixtures("mock_env_api_key")
+def test_get_embeddings_batches_requests():
+    """Verifies texts are sent in batches and results keep input order."""
+    with patch("src.embedding_client.genai.Client") as MockGenAI:
+        mock_client_instance = MockGenAI.return_value
+
+        def embed(model, contents, config):
+            return MagicMock(embeddings=[MagicMock(values=[float(len(t))]) for t in contents])
+
+        mock_client_instance.models.embed_content.side_effect = embed
+
+        client = EmbeddingClient()
+        result = client.get_embeddings(["a", "bb", "", "ccc"], batch_size=2)
+
+        assert [r.tolist() if r is not None else None for r in result] == [[1.0], [2.0], None, [3.0]]
+        calls = mock_client_instance.models.embed_content.call_args_list
+        assert sorted(c.kwargs["contents"] for c in calls) == [["a", "bb"], ["ccc"]]
+
+@pytest.mark.usefixtures("mock_env_api_key")
+def test_get_embeddings_empty_input():
+    """Ensures no requests are made when there is nothing to embed."""
+    with patch("src.embedding_client.genai.Client") as MockGenAI:
+        client = EmbeddingClient()
+        assert client.get_embeddings([]) == []
+        assert client.get_embeddings(["", ""]) == [None, None]
+        MockGenAI.return_value.models.embed_content.assert_not_called()
+
+@pytest.mark.usefixtures("mock_env_api_key")
+def test_get_embeddings_failed_batch_yields_none():
+    """Ensures every text in a batch that fails after retries maps to None, without bisecting."""
+    with patch("src.embedding_client.genai.Client") as MockGenAI, \
+         patch("src.embedding_client.time.sleep"):
+        mock_client_instance = MockGenAI.return_value
+        mock_client_instance.models.embed_content.side_effect = Exception("API Error")
+
+        client = EmbeddingClient()
+        assert client.get_embeddings(["a", "b", "c", "d"]) == [None, None, None, None]
+        assert mock_client_instance.models.embed_content.call_count == 3
+
+def _rejecting_embed(bad_texts):
+    """Builds an embed_content fake that rejects any request containing one of `bad_texts` with HTTP 400."""
+    def embed(model, contents, config):
+        if any(text in bad_texts for text in contents):
+            raise errors.ClientError(400, {"error": {"code": 400, "message": "bad input", "status": "INVALID_ARGUMENT"}})
+        return MagicMock(embeddings=[MagicMock(values=[float(len(t))]) for t in contents])
+    return embed
+
+@pytest.mark.usefixtures("mock_env_api_key")
+def test_get_embeddings_isolates_failing_text():
+    """Checks that a text rejected by the API only loses its own embedding, without retries."""
+    with patch("src.embedding_client.genai.Client") as MockGenAI, \
+         patch("src.embedding_client.time.sleep") as mock_sleep:
+        MockGenAI.return_value.models.embed_content.side_effect = _rejecting_embed({"bad"})
+
+        client = EmbeddingClient()
+        result = client.get_embeddings(["a", "bb", "bad", "cccc"])
+
+        assert [r.tolist() if r is not None else None for r in result] == [[1.0], [2.0], None, [4.0]]
+        mock_sleep.assert_not_called()
+
+@pytest.mark.usefixtures("mock_env_api_key")
+def test_get_embeddings_isolates_bad_texts_in_both_halves():
+    """Verifies bad texts in different halves of a batch are each isolated, keeping every other text."""
+    texts = [f"text {i}" for i in range(100)]
+    bad = {texts[10], texts[80]}
+    with patch("src.embedding_client.genai.Client") as MockGenAI:
+        mock_embed = MockGenAI.return_value.models.embed_content
+        mock_embed.side_effect = _rejecting_embed(bad)
+
+        client = EmbeddingClient()
+        result = client.get_embeddings(texts)
+
+        assert [i for i, r in enumerate(result) if r is None] == [10, 80]
+        assert mock_embed.call_count < 30
+
+@pytest.mark.usefixtures("mock_env_api_key")
+def test_get_embeddings_gives_up_on_other_client_errors():
+    """Ensures a non-input client error (e.g. 403) fails the batch once, with no retries or bisection."""
+    with patch("src.embedding_client.genai.Client") as MockGenAI:
+        mock_embed = MockGenAI.return_value.models.embed_content
+        mock_embed.side_effect = errors.ClientError(403, {"error": {"code": 403, "message": "denied", "status": "PERMISSION_DENIED"}})
+
+        client = EmbeddingClient()
+        assert client.get_embeddings(["a", "b", "c", "d"]) == [None, None, None, None]
+        mock_embed.assert_called_once()
+
+@pytest.mark.usefixtures("mock_env_api_key")
+@pytest.mark.parametrize("response_json", [
+    {"error": {"code": 400, "message": "API key not valid.", "status": "INVALID_ARGUMENT", "details": [
+        {"@type": "type.googleapis.com/google.rpc.ErrorInfo", "reason": "API_KEY_INVALID"}
+    ]}},
+    {"error": {"code": 400, "message": "User location is not supported.", "status": "FAILED_PRECONDITION"}},
+])
+def test_request_wide_bad_request_costs_one_request(response_json):
+    """Ensures a 400 that concerns the whole request (e.g. an invalid API key) is not bisected."""
+    with patch("src.embedding_client.genai.Client") as MockGenAI:
+        mock_embed = MockGenAI.return_value.models.embed_content
+        mock_embed.side_effect = errors.ClientError(400, response_json)
+
+        client = EmbeddingClient()
+        assert client.get_embeddings([f"text {i}" for i in range(100)]) == [None] * 100
+        mock_embed.assert_called_once()
+
+@pytest.mark.usefixtures("mock_env_api_key")
+def test_rate_limit_is_retried():
+    """Checks that HTTP 429 is treated as transient and retried rather than bisected."""
+    with patch("src.embedding_client.genai.Client") as MockGenAI, \
+         patch("src.embedding_client.time.sleep"):
+        mock_embed = MockGenAI.return_value.models.embed_content
+        mock_embed.side_effect = [
+            errors.ClientError(429, {"error": {"code": 429, "message": "slow down", "status": "RESOURCE_EXHAUSTED"}}),
+            MagicMock(embeddings=[MagicMock(values=[1.0]), MagicMock(values=[2.0])]),
+        ]
+
+        client = EmbeddingClient()
+        result = client.get_embeddings(["a", "b"])
+
+        assert [r.tolist() for r in result] == [[1.0], [2.0]]
+        assert mock_embed.call_count == 2
+        assert mock_embed.call_args.kwargs["contents"] == ["a", "b"]
+
+@pytest.mark.usefixtures("mock_env_api_key")
+def test_retry_uses_jittered_backoff():
+    """Verifies retries sleep with jittered backoff and not after the final attempt."""
+    with patch("src.embedding_client.genai.Client") as MockGenAI, \
+         patch("src.embedding_client.time.sleep") as mock_sleep:
+        MockGenAI.return_value.models.embed_content.side_effect = Exception("API Error")
+
+        client = EmbeddingClient()
+        assert client.get_embedding("text") is None
+
+        assert mock_sleep.call_count == 2
+        for (delay,), _ in mock_sleep.call_args_list:
+            assert RETRY_MIN_DELAY <= delay <= RETRY_MAX_DELAY
+
+@pytest.mark.usefixtures("mock_env_api_key")
+def test_requests_hold_a_shared_slot():
+    """Checks that each API request runs while holding the slot set by limit_concurrent_requests."""
+    slots = MagicMock()
+    with patch("src.embedding_client.genai.Client") as MockGenAI, \
+         patch("src.embedding_client._request_slots"):
+        def embed(model, contents, config):
+            assert slots.__enter__.call_count == 1 and slots.__exit__.call_count == 0
+            return MagicMock(embeddings=[MagicMock(values=[1.0])])
+
+        MockGenAI.return_value.models.embed_content.side_effect = embed
+        limit_concurrent_requests(slots)
+
+        assert EmbeddingClient().get_embedding("text").tolist() == [1.0]
+        slots.__exit__.assert_called_once()
+
+def test_backoff_delay_is_capped():
+    """Ensures the backoff ceiling grows exponentially but never exceeds the cap."""
+    with patch("src.embedding_client.random.uniform", side_effect=lambda lo, hi: hi):
+        assert _backoff_delay(0) == pytest.approx(0.2)
+        assert _backoff_delay(2) == pytest.approx(0.8)
+        assert _backoff_delay(10) == RETRY_MAX_DELAY
+
+def test_get_embeddings_uses_cache(tmp_path):
+    """Verifies cached texts skip the API and duplicates are requested only once."""
+    env = {"GEMINI_API_KEY": "fake_key", "EMBEDDING_CACHE_PATH": str(tmp_path / "cache.sqlite3")}
+    with patch.dict(os.environ, env), \
+         patch("src.embedding_client.genai.Client") as MockGenAI:
+        mock_embed = MockGenAI.return_value.models.embed_content
+        mock_embed.side_effect = lambda model, contents, config: MagicMock(
+            embeddings=[MagicMock(values=[0.5, float(len(t))]) for t in contents]
+        )
+
+        client = EmbeddingClient()
+        result = client.get_embeddings(["a", "bb", "a"])
+        assert [r.tolist() for r in result] == [[0.5, 1.0], [0.5, 2.0], [0.5, 1.0]]
+        assert mock_embed.call_args.kwargs["contents"] == ["a", "bb"]
+
+        # A fresh client reads the persisted vectors and only embeds the new text
+        client = EmbeddingClient()
+        result = client.get_embeddings(["bb", "ccc"])
+        assert [r.tolist() for r in result] == [[0.5, 2.0], [0.5, 3.0]]
+        assert mock_embed.call_count == 2
+        assert mock_embed.call_args.kwargs["contents"] == ["ccc"]
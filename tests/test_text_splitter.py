@@ -1,4 +1,5 @@
 import pytest
+import os
 from unittest.mock import patch, MagicMock
 from src.text_splitter import split_by_fixed_size, split_by_sentence, split_by_paragraph
 
@@ -37,29 +38,50 @@ def test_fixed_size_smaller_than_chunk():
     chunks = split_by_fixed_size(text, chunk_size=5, overlap=0)
     assert chunks == ["abc"]
 
+@pytest.mark.parametrize("text_len", [1, 5, 9, 10, 11, 23])
+@pytest.mark.parametrize("chunk_size,overlap", [(5, 0), (5, 2), (5, 4), (1, 0)])
+def test_fixed_size_matches_sliding_window(text_len, chunk_size, overlap):
+    """Checks chunk boundaries against a step-by-step sliding window, including the last chunk."""
+    text = "".join(chr(ord("a") + i % 26) for i in range(text_len))
+    expected = []
+    start = 0
+    while True:
+        end = min(start + chunk_size, text_len)
+        expected.append(text[start:end])
+        if end == text_len:
+            break
+        start = end - overlap
+    assert split_by_fixed_size(text, chunk_size=chunk_size, overlap=overlap) == expected
+
 # --- Sentence Splitter Tests ---
 
+@pytest.fixture
+def nltk_splitter():
+    """Selects the NLTK sentence tokenizer for the duration of a test."""
+    with patch.dict(os.environ, {"SENTENCE_SPLITTER": "nltk"}):
+        yield
+
+@pytest.mark.usefixtures("nltk_splitter")
 def test_sentence_split_basic():
     """Tests basic sentence splitting logic using a mock tokenizer."""
     text = "Hello world. This is a test."
-    with patch("src.text_splitter._ensure_punkt"), \
-         patch("src.text_splitter.nltk.sent_tokenize") as mock_tokenize:
-        
+    with patch("src.text_splitter._get_tokenizer") as mock_get_tokenizer:
+        mock_tokenize = mock_get_tokenizer.return_value.tokenize
         mock_tokenize.return_value = ["Hello world.", "This is a test."]
         
         chunks = split_by_sentence(text, max_chars=50)
         assert len(chunks) == 1
         assert chunks[0] == "Hello world. This is a test."
 
+@pytest.mark.usefixtures("nltk_splitter")
 def test_sentence_split_max_chars():
     """
     Verifies that sentences are grouped together but split when the cumulative length 
     exceeds max_chars.
     """
     text = "S1. S2. S3."
-    with patch("src.text_splitter._ensure_punkt"), \
-         patch("src.text_splitter.nltk.sent_tokenize") as mock_tokenize:
-         
+    with patch("src.text_splitter._get_tokenizer") as mock_get_tokenizer:
+        mock_tokenize = mock_get_tokenizer.return_value.tokenize
         # Mock behavior: return 3 sentences
         mock_tokenize.return_value = ["S1.", "S2.", "S3."]
         
@@ -72,6 +94,31 @@ def test_sentence_split_max_chars():
         # Expected: ["S1. S2.", "S3."]
         assert chunks == ["S1. S2.", "S3."]
 
+def test_sentence_tokenizer_loaded_once():
+    """Checks that the punkt data check and tokenizer load run once for many calls."""
+    from src import text_splitter
+    text_splitter._get_tokenizer.cache_clear()
+    try:
+        with patch("src.text_splitter._ensure_punkt") as mock_ensure, \
+             patch("src.text_splitter.nltk.tokenize.PunktTokenizer") as mock_punkt:
+            first = text_splitter._get_tokenizer()
+            second = text_splitter._get_tokenizer()
+        assert first is second is mock_punkt.return_value
+        mock_ensure.assert_called_once()
+        mock_punkt.assert_called_once_with("english")
+    finally:
+        text_splitter._get_tokenizer.cache_clear()
+
+def test_sentence_split_regex_boundaries():
+    """Checks the default regex splitter on quotes, brackets, numbers and abbreviations."""
+    text = 'He said "Stop." Then left. See e.g. this one. (Aside.) Value 3.5 is ok! Done?\nYes'
+    with patch("src.text_splitter._get_tokenizer") as mock_get_tokenizer:
+        chunks = split_by_sentence(text, max_chars=1)
+    mock_get_tokenizer.assert_not_called()
+    assert chunks == [
+        'He said "Stop."', "Then left.", "See e.g. this one.", "(Aside.)", "Value 3.5 is ok!", "Done?", "Yes"
+    ]
+
 def test_sentence_split_empty():
     """Ensures empty string input returns an empty list."""
     assert split_by_sentence("") == []
@@ -98,3 +145,8 @@ def test_paragraph_split_max_chars():
 def test_paragraph_split_empty():
     """Ensures empty string input results in an empty list."""
     assert split_by_paragraph("") == []
+
+def test_paragraph_split_newline_runs():
+    """Ensures runs of three or more newlines and whitespace-only paragraphs are handled like single breaks."""
+    text = "  Para1. \n\n\nPara2.\n\n \n\n\n\nPara3.\t\n\n"
+    assert split_by_paragraph(text, max_chars=1) == ["Para1.", "Para2.", "Para3."]